@@ -2,21 +2,67 @@
 
 import hashlib
 import threading
-from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union, cast
+
+# Placeholder hashes must match the TypeScript SDK (SHA-256, first 4 bytes as
+# hex), so the algorithm is part of the cross-language contract.
+_sha256 = hashlib.sha256
+
+# Forward-map key: the bare text in the default session, (session_id, text)
+# otherwise. Skipping the tuple for the common case saves ~70 bytes per entry
+# and a tuple allocation per lookup.
+_ForwardKey = Union[str, Tuple[str, str]]
+
+
+def _placeholder_prefix(entity_type: Optional[str]) -> str:
+    if entity_type:
+        return f"[REDACTED_{entity_type.upper()}_"
+    return "[REDACTED_"
 
 
 class AegisProtector:
     """Protects sensitive information through redaction and unredaction."""
 
-    def __init__(self):
-        """Initialize the AegisProtector with empty mappings."""
+    __slots__ = ("_lock", "_max_entries", "_mapping", "_reverse_mapping", "__weakref__")
+
+    def __init__(self, max_entries: Optional[int] = None, reversible: bool = True):
+        """
+        Initialize the AegisProtector with empty mappings.
+
+        Args:
+            max_entries: Optional cap on the number of stored mappings. When the
+                cap is exceeded, the least recently redacted entry is evicted and
+                its placeholder can no longer be unredacted. None (default) keeps
+                every mapping for the lifetime of the instance.
+            reversible: Keep the placeholder -> text map needed by unredact().
+                Pass False for one-way scrubbing to halve mapping memory and
+                insert work; unredact() then always raises ValueError.
+
+        Raises:
+            ValueError: If max_entries is not a positive integer
+        """
+        if max_entries is not None and max_entries < 1:
+            raise ValueError("max_entries must be a positive integer or None")
         self._lock = threading.RLock()
-        self._mapping: Dict[Tuple[str, str], str] = {}
-        self._reverse_mapping: Dict[str, str] = {}
+        self._max_entries = max_entries
+        # OrderedDict only when bounded: it gives O(1) access to the oldest entry.
+        self._mapping: Dict[_ForwardKey, str] = (
+            {} if max_entries is None else OrderedDict()
+        )
+        self._reverse_mapping: Optional[Dict[str, str]] = {} if reversible else None
+
+    # redact(), redact_many() and redact_spans() inline this expression on their
+    # hot paths; keep those copies in sync when changing the key shape.
+    @staticmethod
+    def _forward_key(session_id: Optional[str], text: str) -> _ForwardKey:
+        return (session_id, text) if session_id else text
 
     @staticmethod
-    def _session_key(session_id: Optional[str]) -> str:
-        return session_id if session_id is not None else ""
+    def _split_forward_key(forward_key: _ForwardKey) -> Tuple[str, str]:
+        if isinstance(forward_key, str):
+            return "", forward_key
+        return forward_key
 
     def redact(
         self,
@@ -43,23 +89,167 @@ class AegisProtector:
             A placeholder string that can be used to unredact the text later
         """
         with self._lock:
-            sk = self._session_key(session_id)
-            forward_key = (sk, text)
-            if forward_key in self._mapping:
-                return self._mapping[forward_key]
+            mapping = self._mapping
+            # Inlined _forward_key(session_id, text).
+            forward_key = (session_id, text) if session_id else text
+            existing = mapping.get(forward_key)
+            if existing is not None:
+                if self._max_entries is not None:
+                    # Bounded instances always hold an OrderedDict (see __init__).
+                    cast("OrderedDict[_ForwardKey, str]", mapping).move_to_end(
+                        forward_key
+                    )
+                return existing
+            return self._insert_unlocked(
+                forward_key, text, session_id, _placeholder_prefix(entity_type)
+            )
+
+    def redact_many(
+        self,
+        texts: Iterable[str],
+        entity_type: Optional[str] = None,
+        session_id: Optional[str] = None,
+    ) -> List[str]:
+        """
+        Redact a batch of texts that share one entity type and session.
+
+        Equivalent to calling redact() for each text in order, but takes the
+        lock once and resolves the entity-type prefix once for the whole batch.
 
-            digest_input = f"{sk}\0{text}".encode()
-            text_hash = hashlib.sha256(digest_input).hexdigest()[:8]
+        With max_entries, a batch with more distinct texts than the cap evicts
+        its own earlier entries, so their placeholders can no longer be
+        unredacted.
 
-            if entity_type:
-                placeholder = f"[REDACTED_{entity_type.upper()}_{text_hash}]"
-            else:
-                placeholder = f"[REDACTED_{text_hash}]"
+        Thread-safe.
+
+        Args:
+            texts: The sensitive texts to redact
+            entity_type: Optional type of entity applied to every text
+            session_id: Optional logical session applied to every text
 
-            self._mapping[forward_key] = placeholder
+        Returns:
+            Placeholders in the same order as texts
+        """
+        with self._lock:
+            mapping = self._mapping
+            insert = self._insert_unlocked
+            lru: Optional["OrderedDict[_ForwardKey, str]"] = None
+            if self._max_entries is not None:
+                lru = cast("OrderedDict[_ForwardKey, str]", mapping)
+            prefix = _placeholder_prefix(entity_type)
+            placeholders: List[str] = []
+            append = placeholders.append
+            for text in texts:
+                # Inlined _forward_key(session_id, text).
+                forward_key = (session_id, text) if session_id else text
+                placeholder = mapping.get(forward_key)
+                if placeholder is None:
+                    placeholder = insert(forward_key, text, session_id, prefix)
+                elif lru is not None:
+                    lru.move_to_end(forward_key)
+                append(placeholder)
+            return placeholders
+
+    def redact_spans(
+        self,
+        source: str,
+        spans: Iterable[Tuple[int, int, Optional[str]]],
+        session_id: Optional[str] = None,
+    ) -> str:
+        """
+        Replace character spans of source with placeholders in a single pass.
+
+        Each span is (start, end, entity_type) and covers source[start:end].
+        Spans must be in ascending order and must not overlap; they are all
+        checked before any is redacted. The placeholder for each span equals
+        what redact() returns for that text and entity type.
+
+        With max_entries, a document with more distinct spans than the cap
+        evicts its own earlier entries during the call, and with
+        reversible=False unredact() always raises; such protectors may not be
+        able to unredact every placeholder in the result.
+
+        Thread-safe.
+
+        Args:
+            source: The full text containing sensitive values
+            spans: (start, end, entity_type) tuples; entity_type may be None
+            session_id: Optional logical session applied to every span
+
+        Returns:
+            source with every span replaced by its placeholder
+
+        Raises:
+            ValueError: If a span is empty, out of range, or overlaps the previous one
+        """
+        spans = list(spans)
+        source_len = len(source)
+        last_end = 0
+        # Check every span up front so a rejected call leaves the mapping untouched.
+        for start, end, _ in spans:
+            if not last_end <= start < end <= source_len:
+                raise ValueError(
+                    f"Span ({start}, {end}) is empty, out of range, or overlaps "
+                    f"a previous span"
+                )
+            last_end = end
+
+        with self._lock:
+            mapping = self._mapping
+            insert = self._insert_unlocked
+            lru: Optional["OrderedDict[_ForwardKey, str]"] = None
+            if self._max_entries is not None:
+                lru = cast("OrderedDict[_ForwardKey, str]", mapping)
+            parts: List[str] = []
+            append = parts.append
+            last_end = 0
+            for start, end, entity_type in spans:
+                text = source[start:end]
+                # Inlined _forward_key(session_id, text).
+                forward_key = (session_id, text) if session_id else text
+                placeholder = mapping.get(forward_key)
+                if placeholder is None:
+                    placeholder = insert(
+                        forward_key, text, session_id, _placeholder_prefix(entity_type)
+                    )
+                elif lru is not None:
+                    lru.move_to_end(forward_key)
+                append(source[last_end:start])
+                append(placeholder)
+                last_end = end
+            append(source[last_end:])
+            return "".join(parts)
+
+    def _insert_unlocked(
+        self,
+        forward_key: _ForwardKey,
+        text: str,
+        session_id: Optional[str],
+        prefix: str,
+    ) -> str:
+        digest_input = f"{session_id or ''}\0{text}".encode()
+        placeholder = f"{prefix}{_sha256(digest_input).digest()[:4].hex()}]"
+
+        self._mapping[forward_key] = placeholder
+        if self._reverse_mapping is not None:
             self._reverse_mapping[placeholder] = text
 
-            return placeholder
+        if self._max_entries is not None:
+            self._evict_unlocked(self._max_entries)
+
+        return placeholder
+
+    def _evict_unlocked(self, max_entries: int) -> None:
+        mapping = self._mapping
+        reverse = self._reverse_mapping
+        while len(mapping) > max_entries:
+            oldest = next(iter(mapping))
+            placeholder = mapping.pop(oldest)
+            if reverse is None:
+                continue
+            # Only drop the reverse entry if it still belongs to the evicted text.
+            if reverse.get(placeholder) == self._split_forward_key(oldest)[1]:
+                del reverse[placeholder]
 
     def unredact(self, placeholder: str) -> str:
         """
@@ -74,34 +264,34 @@ class AegisProtector:
             The original text
 
         Raises:
-            ValueError: If the placeholder is not found in the mapping
+            ValueError: If the placeholder is not found in the mapping, or the
+                protector was created with reversible=False
         """
         with self._lock:
-            if placeholder not in self._reverse_mapping:
+            if self._reverse_mapping is None:
+                raise ValueError("unredact is unavailable when reversible=False")
+            original = self._reverse_mapping.get(placeholder)
+            if original is None:
                 raise ValueError(f"Placeholder '{placeholder}' not found in mapping")
-            return self._reverse_mapping[placeholder]
+            return original
 
     def _validate_integrity_unlocked(self) -> bool:
-        if len(self._mapping) != len(self._reverse_mapping):
+        reverse = self._reverse_mapping
+        if reverse is None:
+            # One-way mode: only require that no two texts share a placeholder.
+            return len(set(self._mapping.values())) == len(self._mapping)
+
+        if len(self._mapping) != len(reverse):
             return False
 
+        split = self._split_forward_key
         for forward_key, placeholder in self._mapping.items():
-            if placeholder not in self._reverse_mapping:
-                return False
-            _, text = forward_key
-            if self._reverse_mapping[placeholder] != text:
-                return False
-
-        for placeholder, text in self._reverse_mapping.items():
-            found = False
-            for (_, t), ph in self._mapping.items():
-                if ph == placeholder and t == text:
-                    found = True
-                    break
-            if not found:
+            if reverse.get(placeholder) != split(forward_key)[1]:
                 return False
 
-        return True
+        # Every forward entry resolves back and the sizes match, so the maps are
+        # inverses unless two forward keys share a placeholder.
+        return len(set(self._mapping.values())) == len(reverse)
 
     def validate_integrity(self) -> bool:
         """
@@ -127,7 +317,8 @@ class AegisProtector:
         """
         with self._lock:
             entries: List[Dict[str, Any]] = []
-            for (sk, text), placeholder in self._mapping.items():
+            for forward_key, placeholder in self._mapping.items():
+                sk, text = self._split_forward_key(forward_key)
                 entries.append(
                     {
                         "session_id": sk if sk != "" else None,
@@ -140,7 +331,8 @@ class AegisProtector:
     def import_state(self, data: Dict[str, Any]) -> None:
         """
         Replace mappings from export_state() output. Validates structure and
-        integrity before committing.
+        integrity before committing. If the instance was created with
+        max_entries, only the last max_entries entries are kept.
 
         Thread-safe.
 
@@ -157,8 +349,12 @@ class AegisProtector:
             raise ValueError("import_state entries must be a list")
 
         with self._lock:
+            reverse = self._reverse_mapping
             self._mapping.clear()
-            self._reverse_mapping.clear()
+            if reverse is not None:
+                reverse.clear()
+            # One-way mode has no reverse map to catch duplicate placeholders.
+            seen_placeholders: Set[str] = set()
             try:
                 for i, e in enumerate(raw_entries):
                     if not isinstance(e, dict):
@@ -174,22 +370,29 @@ class AegisProtector:
                         raise ValueError(
                             f"import_state entry {i} session_id must be str or null"
                         )
-                    sk = self._session_key(sid)
-                    forward_key = (sk, text)
+                    forward_key = self._forward_key(sid, text)
                     if forward_key in self._mapping:
                         raise ValueError(
                             f"import_state duplicate forward key at entry {i}"
                         )
-                    if placeholder in self._reverse_mapping:
+                    if reverse is None:
+                        duplicate = placeholder in seen_placeholders
+                        seen_placeholders.add(placeholder)
+                    else:
+                        duplicate = placeholder in reverse
+                        reverse[placeholder] = text
+                    if duplicate:
                         raise ValueError(
                             f"import_state duplicate placeholder at entry {i}"
                         )
                     self._mapping[forward_key] = placeholder
-                    self._reverse_mapping[placeholder] = text
 
+                if self._max_entries is not None:
+                    self._evict_unlocked(self._max_entries)
                 if not self._validate_integrity_unlocked():
                     raise ValueError("imported state failed integrity validation")
             except Exception:
                 self._mapping.clear()
-                self._reverse_mapping.clear()
+                if reverse is not None:
+                    reverse.clear()
                 raise
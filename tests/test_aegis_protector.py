@@ -1,6 +1,7 @@
 """Unit tests for AegisProtector class."""
 
 import unittest
+import weakref
 from aegisproxy_sdk import AegisProtector
 
 
@@ -88,6 +89,14 @@ class TestAegisProtector(unittest.TestCase):
         # Empty mappings should still be valid
         self.assertTrue(self.protector.validate_integrity())
 
+    def test_validate_integrity_detects_shared_placeholder(self):
+        """Equal map sizes are not enough if two keys share one placeholder."""
+        ph = self.protector.redact("Name1", session_id="s1")
+        self.protector.redact("Name1", session_id="s2")
+        self.protector._mapping[("s2", "Name1")] = ph
+
+        self.assertFalse(self.protector.validate_integrity())
+
     def test_multiple_redactions_with_unredactions(self):
         """Test multiple redactions followed by unredactions."""
         texts = ["Alice", "Bob", "Charlie", "Alice", "Bob"]
@@ -118,6 +127,13 @@ class TestAegisProtector(unittest.TestCase):
         self.assertEqual(self.protector.unredact(placeholder1), email)
         self.assertEqual(self.protector.unredact(placeholder2), email)
 
+    def test_placeholder_deterministic_across_instances(self):
+        """Placeholders derive from the text, not from per-instance state."""
+        other = AegisProtector()
+        other.redact("unrelated")
+        self.assertEqual(self.protector.redact("Dana"), other.redact("Dana"))
+        self.assertEqual(self.protector.redact("Dana"), "[REDACTED_77dd345b]")
+
     def test_session_id_isolates_same_plaintext(self):
         """Same text in different sessions gets different placeholders."""
         text = "Acme Corp"
@@ -137,6 +153,159 @@ class TestAegisProtector(unittest.TestCase):
             self.protector.redact(text, session_id=sid),
         )
 
+    def test_empty_session_id_is_default_session(self):
+        """An empty session id shares the default (no-session) scope."""
+        placeholder = self.protector.redact("Alice")
+        self.assertEqual(self.protector.redact("Alice", session_id=""), placeholder)
+        self.assertEqual(
+            self.protector.export_state()["entries"],
+            [{"session_id": None, "text": "Alice", "placeholder": placeholder}],
+        )
+
+    def test_redact_many_matches_redact(self):
+        """redact_many returns the same placeholders as per-item redact."""
+        texts = ["Alice", "Bob", "Alice"]
+        placeholders = self.protector.redact_many(
+            texts, entity_type="name", session_id="chat-1"
+        )
+
+        self.assertEqual(placeholders[0], placeholders[2])
+        other = AegisProtector()
+        self.assertEqual(
+            placeholders,
+            [other.redact(t, entity_type="name", session_id="chat-1") for t in texts],
+        )
+        for text, placeholder in zip(texts, placeholders):
+            self.assertEqual(self.protector.unredact(placeholder), text)
+        self.assertTrue(self.protector.validate_integrity())
+
+    def test_redact_many_empty(self):
+        """An empty batch returns an empty list."""
+        self.assertEqual(self.protector.redact_many([]), [])
+
+    def test_redact_spans_replaces_in_order(self):
+        """redact_spans substitutes each span with its redact() placeholder."""
+        source = "Mail alice@example.com or call Alice."
+        redacted = self.protector.redact_spans(
+            source, [(5, 22, "email"), (31, 36, None)], session_id="doc-1"
+        )
+
+        p_email = self.protector.redact("alice@example.com", "email", "doc-1")
+        p_name = self.protector.redact("Alice", session_id="doc-1")
+        self.assertEqual(redacted, f"Mail {p_email} or call {p_name}.")
+        self.assertEqual(self.protector.unredact(p_email), "alice@example.com")
+        self.assertTrue(self.protector.validate_integrity())
+
+    def test_redact_spans_without_spans_returns_source(self):
+        """No spans leaves the source unchanged."""
+        self.assertEqual(self.protector.redact_spans("plain text", []), "plain text")
+
+    def test_redact_spans_rejects_invalid_spans(self):
+        """Overlapping, empty, and out-of-range spans raise ValueError."""
+        source = "Alice and Bob"
+        for spans in ([(0, 5, None), (3, 9, None)], [(2, 2, None)], [(10, 20, None)]):
+            with self.assertRaises(ValueError):
+                self.protector.redact_spans(source, spans)
+
+    def test_redact_spans_rejected_call_leaves_state_unchanged(self):
+        """A bad later span fails before earlier spans touch the mapping."""
+        protector = AegisProtector(max_entries=2)
+        p_x = protector.redact("x")
+        p_y = protector.redact("y")
+        before = protector.export_state()
+
+        with self.assertRaises(ValueError):
+            protector.redact_spans(
+                "Alice and Bob", [(0, 5, None), (10, 13, None), (3, 4, None)]
+            )
+
+        self.assertEqual(protector.export_state(), before)
+        self.assertEqual(protector.unredact(p_x), "x")
+        self.assertEqual(protector.unredact(p_y), "y")
+
+    def test_max_entries_evicts_least_recently_redacted(self):
+        """A bounded protector drops the entry that was redacted longest ago."""
+        protector = AegisProtector(max_entries=2)
+        p_a = protector.redact("a")
+        p_b = protector.redact("b")
+        protector.redact("a")  # refresh "a" so "b" is now the oldest
+        p_c = protector.redact("c")
+
+        with self.assertRaises(ValueError):
+            protector.unredact(p_b)
+        self.assertEqual(protector.unredact(p_a), "a")
+        self.assertEqual(protector.unredact(p_c), "c")
+        self.assertEqual(len(protector.export_state()["entries"]), 2)
+        self.assertTrue(protector.validate_integrity())
+
+    def test_max_entries_batch_hit_refreshes_session_entry(self):
+        """A redact_many hit on a session-scoped key protects it from eviction."""
+        protector = AegisProtector(max_entries=2)
+        p_a, p_b = protector.redact_many(["a", "b"], session_id="chat-1")
+        protector.redact_many(["a"], session_id="chat-1")  # "b" is now the oldest
+        p_c = protector.redact_spans("c", [(0, 1, None)], session_id="chat-1")
+
+        with self.assertRaises(ValueError):
+            protector.unredact(p_b)
+        self.assertEqual(protector.unredact(p_a), "a")
+        self.assertEqual(protector.unredact(p_c), "c")
+        self.assertEqual(
+            [e["session_id"] for e in protector.export_state()["entries"]],
+            ["chat-1", "chat-1"],
+        )
+        self.assertTrue(protector.validate_integrity())
+
+    def test_max_entries_import_keeps_newest(self):
+        """import_state on a bounded protector keeps only the newest entries."""
+        self.protector.redact_many(["a", "b", "c"])
+        bounded = AegisProtector(max_entries=2)
+        bounded.import_state(self.protector.export_state())
+
+        texts = [e["text"] for e in bounded.export_state()["entries"]]
+        self.assertEqual(texts, ["b", "c"])
+        self.assertTrue(bounded.validate_integrity())
+
+    def test_max_entries_must_be_positive(self):
+        """A zero or negative cap is rejected."""
+        with self.assertRaises(ValueError):
+            AegisProtector(max_entries=0)
+
+    def test_one_way_protector_redacts_without_reverse_map(self):
+        """reversible=False keeps referential integrity but refuses unredact."""
+        protector = AegisProtector(reversible=False)
+        placeholder = protector.redact("Alice", entity_type="name")
+
+        self.assertEqual(placeholder, self.protector.redact("Alice", entity_type="name"))
+        self.assertEqual(protector.redact("Alice", entity_type="name"), placeholder)
+        with self.assertRaises(ValueError):
+            protector.unredact(placeholder)
+        self.assertTrue(protector.validate_integrity())
+
+    def test_one_way_protector_import_rejects_duplicate_placeholders(self):
+        """One-way import rejects shared placeholders, even if later trimmed."""
+        payload = {
+            "v": 1,
+            "entries": [
+                {"session_id": None, "text": "a", "placeholder": "[REDACTED_deadbeef]"},
+                {"session_id": None, "text": "b", "placeholder": "[REDACTED_deadbeef]"},
+                {"session_id": None, "text": "c", "placeholder": "[REDACTED_cafebabe]"},
+            ],
+        }
+        for protector in (
+            AegisProtector(reversible=False),
+            AegisProtector(max_entries=1, reversible=False),
+        ):
+            with self.assertRaisesRegex(ValueError, "duplicate placeholder at entry 1"):
+                protector.import_state(payload)
+            self.assertEqual(protector.export_state()["entries"], [])
+
+    def test_slots_reject_new_attributes_but_allow_weakrefs(self):
+        """__slots__ blocks ad-hoc attributes while keeping weakref support."""
+        protector = AegisProtector()
+        self.assertIs(weakref.ref(protector)(), protector)
+        with self.assertRaises(AttributeError):
+            protector.foo = 1
+
     def test_export_import_roundtrip(self):
         """export_state / import_state preserves redact-unredact behavior."""
         self.protector.redact("a", session_id="s1")